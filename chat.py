@@ -1,44 +1,73 @@
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-
-# 1. Load text from a TXT file
-def load_text_from_txt(txt_file):
-    with open(txt_file, "r", encoding="utf-8", errors="ignore") as f:
-        return f.read()
-
-# 2. Split content into sentences / bullet points
-def split_into_sentences(text):
-    import re
-    # supports bullet points and numbers
-    lines = re.split(r'\n|•|- |\*|\d+\)', text)
-    sentences = [l.strip() for l in lines if l.strip()]
-    return sentences
-
-# 3. Build knowledge base
-def build_knowledge_base(txt_file):
-    text = load_text_from_txt(txt_file)
-    sentences = split_into_sentences(text)
-    vectorizer = TfidfVectorizer().fit(sentences)
-    sentence_vectors = vectorizer.transform(sentences)
-    return sentences, vectorizer, sentence_vectors
-
-# 4. Answer question
-def answer_question(question, sentences, vectorizer, sentence_vectors, top_k=1):
-    q_vec = vectorizer.transform([question])
-    sims = cosine_similarity(q_vec, sentence_vectors).flatten()
-    top_indices = sims.argsort()[::-1][:top_k]
-    best_sentence = sentences[top_indices[0]]
-    return f"\n📌 Most Relevant Answer:\n{best_sentence}"
-
-# ---------- DEMO ----------
-if __name__ == "__main__":
-    # change filename here
-    sentences, vectorizer, sentence_vectors = build_knowledge_base("notes.txt")
-
-    print("\n🧠 Offline TXT Chatbot Ready! (type 'exit' to quit)")
-    while True:
-        query = input("\n❓ You: ")
-        if query.lower() == "exit":
-            break
-        answer = answer_question(query, sentences, vectorizer, sentence_vectors, top_k=1)
-        print("🤖 Bot:", answer)
\ No newline at end of file
+import os
+import re
+
+import joblib
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer
+
+# 1. Load text from a TXT file
+def load_text_from_txt(txt_file):
+    with open(txt_file, "r", encoding="utf-8", errors="ignore") as f:
+        return f.read()
+
+# supports bullet points and numbers, compiled once at import
+_SENT_SPLIT = re.compile(r'\n|•|- |\*|\d+\)')
+
+# 2. Split content into sentences / bullet points
+def split_into_sentences(text):
+    lines = _SENT_SPLIT.split(text)
+    sentences = [l.strip() for l in lines if l.strip()]
+    return sentences
+
+# Cached vectors live next to the notes file
+def _cache_path(txt_file):
+    return txt_file + ".tfidf.joblib"
+
+# 3. Build knowledge base (cached on disk, rebuilt when the notes change)
+def build_knowledge_base(txt_file):
+    cache_file = _cache_path(txt_file)
+    mtime = os.path.getmtime(txt_file)
+    if os.path.exists(cache_file):
+        try:
+            cached_mtime, sentences, vectorizer, sentence_vectors = joblib.load(cache_file)
+            if cached_mtime == mtime:
+                return sentences, vectorizer, sentence_vectors
+        except Exception:
+            pass  # stale or corrupt cache, rebuild below
+    text = load_text_from_txt(txt_file)
+    sentences = split_into_sentences(text)
+    # stateless hashing: no vocabulary dict to build or pickle, single pass,
+    # and norm='l2' keeps the sparse-matvec query path valid
+    vectorizer = HashingVectorizer(n_features=2**18, alternate_sign=False,
+                                   norm='l2', ngram_range=(1, 1))
+    sentence_vectors = vectorizer.transform(sentences)
+    joblib.dump((mtime, sentences, vectorizer, sentence_vectors), cache_file, compress=3)
+    return sentences, vectorizer, sentence_vectors
+
+# 4. Answer question
+def answer_question(question, sentences, vectorizer, sentence_vectors, top_k=1):
+    q_vec = vectorizer.transform([question])  # already L2-normalized by the vectorizer
+    # sentence_vectors is pre-normalized, so cosine similarity is just a sparse matvec
+    sims = (q_vec @ sentence_vectors.T).toarray().ravel()
+    if top_k == 1:
+        best_sentence = sentences[int(np.argmax(sims))]
+    else:
+        # argpartition finds the top-k in O(N) instead of sorting everything
+        k = min(top_k, sims.size)
+        idx = np.argpartition(-sims, k - 1)[:k]
+        top_indices = idx[np.argsort(-sims[idx])]
+        best_sentence = sentences[top_indices[0]]
+    return f"\n📌 Most Relevant Answer:\n{best_sentence}"
+
+# ---------- DEMO ----------
+if __name__ == "__main__":
+    # change filename here
+    sentences, vectorizer, sentence_vectors = build_knowledge_base("notes.txt")
+
+    print("\n🧠 Offline TXT Chatbot Ready! (type 'exit' to quit)")
+    while True:
+        query = input("\n❓ You: ")
+        if query.lower() == "exit":
+            break
+        answer = answer_question(query, sentences, vectorizer, sentence_vectors, top_k=1)
+        print("🤖 Bot:", answer)
@@ -4,33 +4,99 @@ Transcribes and summarizes video/audio without internet
 """
 
 import os
+import re
+import subprocess
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import torch
 from faster_whisper import WhisperModel
-from transformers import pipeline
-from moviepy.editor import VideoFileClip
+from sklearn.feature_extraction.text import TfidfVectorizer
+from transformers import AutoModelForSeq2SeqLM, AutoTokenizer, pipeline
 import warnings
 warnings.filterwarnings('ignore')
 
+# sentence boundary after ./!/?, compiled once at import
+_SENT_END = re.compile(r'(?<=[.!?])\s+')
+
+def _bullet_lines(text):
+    """Sentence-split text into bullet lines, dropping short fragments"""
+    return [f"• {s}" for s in (s.strip() for s in _SENT_END.split(text)) if len(s) > 15]
+
 class OfflineNotesSummarizer:
-    def __init__(self, whisper_model_size="small", device="cpu"):
+    def __init__(self, whisper_model_size="small", device="cpu", compute_type=None,
+                 summarizer_model="sshleifer/distilbart-cnn-12-6", beam_size=1,
+                 cpu_threads=None, num_workers=1, summarizer_backend="extractive"):
         """
         Initialize the summarizer
         whisper_model_size: tiny, base, small, medium, large
         device: cpu or cuda
+        compute_type: None picks int8_float16 on cuda (INT8 weights, FP16
+                      tensor-core compute) and int8 on cpu; "float16" or
+                      "int8_float32" can be passed to trade speed for accuracy
+        summarizer_model: HF model id for summarization (distilled by default)
+        beam_size: Whisper decoder beam width (1 = greedy; raise for accuracy)
+        cpu_threads: ctranslate2 intra-op threads (None = one per CPU)
+        num_workers: ctranslate2 transcription workers (>1 allows concurrent calls)
+        summarizer_backend: "extractive" (TF-IDF sentence ranking, no extra
+                            model) or "bart" (abstractive, slower, ~1 GB RAM)
         """
+        self.device = device
+        self.summarizer_backend = summarizer_backend
+        self.beam_size = beam_size
+        if compute_type is None:
+            compute_type = "int8_float16" if device == "cuda" else "int8"
+        if cpu_threads is None:
+            cpu_threads = os.cpu_count() or 4
         print(f"🔧 Loading Whisper model ({whisper_model_size})...")
-        self.whisper_model = WhisperModel(whisper_model_size, device=device, compute_type="int8")
-        
-        print("🔧 Loading summarization model...")
-        self.summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
+        self.whisper_model = WhisperModel(whisper_model_size, device=device, compute_type=compute_type,
+                                          cpu_threads=cpu_threads, num_workers=num_workers)
+        try:
+            # pre-cast the mel filterbank once so every fbank pass skips the conversion
+            feature_extractor = self.whisper_model.feature_extractor
+            feature_extractor.mel_filters = feature_extractor.mel_filters.astype(np.float16)
+        except AttributeError:
+            pass  # faster-whisper internals changed; fbank keeps its default dtype
+
+        # summarization model is heavy, so load it lazily on first use
+        self.summarizer_model = summarizer_model
+        self._summarizer = None
         print("✅ Models loaded! Ready to process.")
 
-    def extract_audio(self, video_path, audio_path="temp_audio.mp3"):
-        """Extract audio from video file"""
+    @property
+    def summarizer(self):
+        """Summarization pipeline, built on first access (transcript-only runs skip it)"""
+        if self._summarizer is None:
+            print("🔧 Loading summarization model...")
+            # sdpa = PyTorch's fused scaled-dot-product attention (FlashAttention on GPU)
+            model = AutoModelForSeq2SeqLM.from_pretrained(
+                self.summarizer_model,
+                attn_implementation="sdpa",
+                torch_dtype=torch.float16 if self.device == "cuda" else torch.float32
+            )
+            tokenizer = AutoTokenizer.from_pretrained(self.summarizer_model)
+            if self.device != "cuda":
+                try:
+                    # dynamic INT8 on the Linear layers: ~4x less weight bandwidth on CPU
+                    model = torch.quantization.quantize_dynamic(
+                        model, {torch.nn.Linear}, dtype=torch.qint8
+                    )
+                except Exception:
+                    pass  # quantization unavailable on this build, keep FP32
+            self._summarizer = pipeline("summarization", model=model, tokenizer=tokenizer,
+                                        device=0 if self.device == "cuda" else -1)
+        return self._summarizer
+
+    def extract_audio(self, video_path, audio_path="temp_audio.wav"):
+        """Extract audio from video file as 16 kHz mono WAV (what Whisper wants)"""
         print(f"🎵 Extracting audio from {video_path}...")
         try:
-            video = VideoFileClip(video_path)
-            video.audio.write_audiofile(audio_path, logger=None)
-            video.close()
+            subprocess.run(
+                ["ffmpeg", "-y", "-i", video_path,
+                 "-vn", "-ac", "1", "-ar", "16000", "-f", "wav", audio_path],
+                check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
             print("✅ Audio extracted!")
             return audio_path
         except Exception as e:
@@ -43,74 +109,82 @@ class OfflineNotesSummarizer:
         segments, info = self.whisper_model.transcribe(
             audio_path,
             language=language,
-            beam_size=5
+            beam_size=self.beam_size,
+            vad_filter=True,  # skip silence instead of decoding it
+            vad_parameters=dict(min_silence_duration_ms=500),
+            condition_on_previous_text=False
         )
         
-        transcript = ""
+        parts = []
         timestamps = []
-        
+
         for segment in segments:
-            transcript += segment.text + " "
+            parts.append(segment.text)
             timestamps.append({
                 "start": segment.start,
                 "end": segment.end,
                 "text": segment.text
             })
-        
+
+        # join once instead of += per segment (quadratic on long lectures)
+        transcript = " ".join(p.strip() for p in parts)
         print(f"✅ Transcription complete! Detected language: {info.language}")
-        return transcript.strip(), timestamps
+        return transcript, timestamps
+
+    def extractive_summary(self, text, top_k=15):
+        """Pick the most central sentences by TF-IDF similarity - no model needed"""
+        sentences = [s.strip() for s in _SENT_END.split(text) if len(s.strip()) > 15]
+        if len(sentences) <= top_k:
+            return "\n".join(f"• {s}" for s in sentences)
+        vectors = TfidfVectorizer().fit_transform(sentences)
+        # centrality_i = sum_j x_i . x_j = x_i . (column sums) - O(nnz), no NxN matrix
+        profile = np.asarray(vectors.sum(axis=0)).ravel()
+        centrality = vectors @ profile
+        top = np.sort(np.argpartition(-centrality, top_k - 1)[:top_k])  # keep original order
+        return "\n".join(f"• {sentences[i]}" for i in top)
 
     def summarize(self, text, max_length=130):
         """Summarize text into key points only"""
+        if self.summarizer_backend == "extractive":
+            print("🤖 Extracting key points (extractive)...")
+            return self.extractive_summary(text)
+
         print("🤖 Generating key points summary...")
-        
-        # Split long text into chunks
-        max_chunk_length = 1024
-        words = text.split()
-        chunks = []
-        current_chunk = []
-        current_length = 0
-        
-        for word in words:
-            current_chunk.append(word)
-            current_length += len(word) + 1
-            if current_length >= max_chunk_length:
-                chunks.append(" ".join(current_chunk))
-                current_chunk = []
-                current_length = 0
-        
-        if current_chunk:
-            chunks.append(" ".join(current_chunk))
-        
-        # Summarize each chunk - extract key points only
-        summaries = []
-        for i, chunk in enumerate(chunks):
-            print(f"  Extracting key points from chunk {i+1}/{len(chunks)}...")
-            if len(chunk.split()) > 50:
-                summary = self.summarizer(
-                    chunk,
-                    max_length=max_length,
-                    min_length=25,
-                    do_sample=False,
-                    truncation=True
-                )
-                summaries.append(summary[0]['summary_text'])
-        
-        print("✅ Key points extracted!")
-        # Format as bullet points
-        formatted_summary = self.format_bullet_points(summaries)
-        return formatted_summary
 
-    def format_bullet_points(self, summaries):
-        """Format summaries as bullet points"""
+        word_count = len(text.split())
+        # Short transcripts don't need the model at all
+        if word_count < 80:
+            return "\n".join(_bullet_lines(text))
+
+        # Chunk on the model's real token budget (BART caps at 1024 positions),
+        # not characters - character chunks under-fill by roughly 4x
+        tokenizer = self.summarizer.tokenizer
+        ids = tokenizer.encode(text, add_special_tokens=False)
+        step = 900  # headroom for special tokens
+        if len(ids) > 16 * step:
+            step = -(-len(ids) // 16)  # keep the 16-chunk cap; overflow truncates
+        chunks = [tokenizer.decode(ids[i:i + step]) for i in range(0, len(ids), step)]
+        
+        # Summarize all chunks in one batched call - extract key points only
+        long_chunks = [c for c in chunks if len(c.split()) > 50]
         bullet_points = []
-        for summary in summaries:
-            # Split into sentences
-            sentences = summary.replace('. ', '.|').split('|')
-            for sentence in sentences:
-                sentence = sentence.strip()
-                if len(sentence) > 15: # Only meaningful sentences
-                    bullet_points.append(f"• {sentence}")
+        if long_chunks:
+            print(f"  Extracting key points from {len(long_chunks)} chunks...")
+            outputs = self.summarizer(
+                long_chunks,
+                max_length=max_length,
+                min_length=25,
+                do_sample=False,
+                truncation=True,
+                num_beams=1,  # greedy: beam search dominates generate() cost
+                length_penalty=1.0,
+                batch_size=min(8, len(long_chunks))
+            )
+            # emit bullet lines straight from each summary, no second format pass
+            for out in outputs:
+                bullet_points.extend(_bullet_lines(out['summary_text']))
+
+        print("✅ Key points extracted!")
         return "\n".join(bullet_points)
 
     def process_video(self, video_path, language="en", output_file="notes.txt"):
@@ -139,34 +213,71 @@ class OfflineNotesSummarizer:
         
         return {"transcript": transcript, "summary": summary, "timestamps": timestamps}
 
+    def process_videos(self, video_paths, language="en"):
+        """Process a batch of videos with one model load.
+
+        A single extractor thread keeps the next video's audio ready while the
+        main thread runs Whisper and the summarizer, so extraction and decode
+        overlap. Whisper stays on this thread (ctranslate2 is not thread-safe).
+        Notes are saved as <video name>_notes.txt next to the script.
+        """
+        video_paths = list(video_paths)
+        results = {}
+
+        def finish(video_path, future):
+            audio_path = future.result()
+            if not audio_path:
+                results[video_path] = None
+                return
+            transcript, timestamps = self.transcribe(audio_path, language)
+            summary = self.summarize(transcript)
+            stem = os.path.splitext(os.path.basename(video_path))[0]
+            self.save_notes(transcript, summary, timestamps, f"{stem}_notes.txt")
+            if os.path.exists(audio_path):
+                os.remove(audio_path)
+            results[video_path] = {"transcript": transcript, "summary": summary, "timestamps": timestamps}
+
+        with ThreadPoolExecutor(max_workers=1) as extractor:
+            pending = deque()
+            for i, video_path in enumerate(video_paths):
+                pending.append((video_path, extractor.submit(self.extract_audio, video_path, f"temp_audio_{i}.wav")))
+                if len(pending) > 1:  # keep at most one extraction in flight
+                    finish(*pending.popleft())
+            while pending:
+                finish(*pending.popleft())
+
+        return results
+
     def save_notes(self, transcript, summary, timestamps, output_file):
         """Save formatted notes to file"""
         print(f"💾 Saving notes to {output_file}...")
         
+        buf = []
+        buf.append("=" * 60 + "\n")
+        buf.append("📝 IMPORTANT POINTS - AI NOTES SUMMARY\n")
+        buf.append("=" * 60 + "\n\n")
+
+        buf.append("🎯 KEY TAKEAWAYS\n")
+        buf.append("-" * 60 + "\n\n")
+        buf.append(summary + "\n\n")
+        buf.append("\n" + "=" * 60 + "\n\n")
+
+        buf.append("💡 NOTE: Full transcript available if needed\n")
+        buf.append("The above points capture the essential information.\n\n")
+
+        buf.append("=" * 60 + "\n")
+        buf.append("⏱️ TIMESTAMPS\n")
+        buf.append("=" * 60 + "\n\n")
+
+        # Show only key timestamps (every 5th of the first 40 for overview)
+        for ts in timestamps[:40:5]:
+            minutes, seconds = divmod(int(ts["start"]), 60)
+            buf.append(f"[{minutes:02d}:{seconds:02d}] {ts['text']}\n")
+
+        # single write keeps the IO path to one large buffered flush
         with open(output_file, 'w', encoding='utf-8') as f:
-            f.write("=" * 60 + "\n")
-            f.write("📝 IMPORTANT POINTS - AI NOTES SUMMARY\n")
-            f.write("=" * 60 + "\n\n")
-            
-            f.write("🎯 KEY TAKEAWAYS\n")
-            f.write("-" * 60 + "\n\n")
-            f.write(summary + "\n\n")
-            f.write("\n" + "=" * 60 + "\n\n")
-            
-            f.write("💡 NOTE: Full transcript available if needed\n")
-            f.write("The above points capture the essential information.\n\n")
-            
-            f.write("=" * 60 + "\n")
-            f.write("⏱️ TIMESTAMPS\n")
-            f.write("=" * 60 + "\n\n")
-            
-            # Show only key timestamps (every 5th one for overview)
-            for i, ts in enumerate(timestamps):
-                if i % 5 == 0 and i < 40: # Show fewer, more important points
-                    minutes = int(ts["start"] // 60)
-                    seconds = int(ts["start"] % 60)
-                    f.write(f"[{minutes:02d}:{seconds:02d}] {ts['text']}\n")
-        
+            f.write("".join(buf))
+
         print(f"✅ Notes saved successfully!")
 
 # Usage Example